@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Specialized BER encoder for the fixed-layout SNMPv2c traps in trap-sender.py
+
+Writes straight into a preallocated scratch buffer so the hot path of a
+trap burst does no pysnmp work. Every OID these traps use is a literal, so
+they are encoded once at import time and copied in as-is.
+
+The varbinds follow what pysnmp's sendNotification() puts on the wire for
+the same traps. First come sysUpTime and snmpTrapOID set to the
+NotificationType OID. Then come the sysUpTime and snmpTrapOID that
+trap-sender.py lists explicitly, and then the remaining varbinds.
+"""
+
+# BER tags
+INTEGER = 0x02
+OCTET_STRING = 0x04
+OBJECT_IDENTIFIER = 0x06
+SEQUENCE = 0x30
+IP_ADDRESS = 0x40
+TIMETICKS = 0x43
+SNMPV2_TRAP = 0xa7
+
+# Room for the fixed part of any trap built here; _begin_trap() grows the
+# buffer by the size of the variable-length inputs on top of that
+SCRATCH_SIZE = 512
+
+# Constructed TLVs are written with a 2-byte length (see _open)
+MAX_LENGTH = 0xffff
+
+def new_buffer():
+    """Allocate a scratch buffer for the build_* functions"""
+    return bytearray(SCRATCH_SIZE)
+
+def emit_length(buf, pos, n):
+    """Write a BER length at pos and return the next position"""
+    if n < 0x80:
+        buf[pos] = n
+        return pos + 1
+    if n < 0x100:
+        buf[pos] = 0x81
+        buf[pos + 1] = n
+        return pos + 2
+    if n > MAX_LENGTH:
+        raise ValueError(f'BER length {n} exceeds {MAX_LENGTH} bytes')
+    buf[pos] = 0x82
+    buf[pos + 1] = n >> 8
+    buf[pos + 2] = n & 0xff
+    return pos + 3
+
+def emit_integer(buf, pos, val, tag=INTEGER):
+    """Write an INTEGER (or application integer type such as TimeTicks)"""
+    data = val.to_bytes(val.bit_length() // 8 + 1, 'big', signed=True)
+    buf[pos] = tag
+    pos = emit_length(buf, pos + 1, len(data))
+    buf[pos:pos + len(data)] = data
+    return pos + len(data)
+
+def emit_octets(buf, pos, data, tag=OCTET_STRING):
+    """Write an OCTET STRING (or IpAddress) from bytes"""
+    buf[pos] = tag
+    pos = emit_length(buf, pos + 1, len(data))
+    buf[pos:pos + len(data)] = data
+    return pos + len(data)
+
+def emit_oid(buf, pos, oid_bytes):
+    """Copy a TLV produced by compile_oid() into the buffer"""
+    buf[pos:pos + len(oid_bytes)] = oid_bytes
+    return pos + len(oid_bytes)
+
+def compile_oid(oid):
+    """Encode a dotted OID string into a complete OBJECT IDENTIFIER TLV"""
+    arcs = [int(arc) for arc in oid.split('.')]
+    content = bytearray([arcs[0] * 40 + arcs[1]])
+    for arc in arcs[2:]:
+        chunk = [arc & 0x7f]
+        arc >>= 7
+        while arc:
+            chunk.append(0x80 | (arc & 0x7f))
+            arc >>= 7
+        content.extend(reversed(chunk))
+    tlv = bytearray(len(content) + 4)
+    pos = emit_octets(tlv, 0, content, OBJECT_IDENTIFIER)
+    return bytes(tlv[:pos])
+
+def _open(buf, pos, tag):
+    """Start a constructed TLV with a 3-byte length to patch; return content start"""
+    buf[pos] = tag
+    buf[pos + 1] = 0x82
+    return pos + 4
+
+def _close(buf, start, pos):
+    """Patch the length of the constructed TLV whose content began at start"""
+    n = pos - start
+    if n > MAX_LENGTH:
+        raise ValueError(f'BER length {n} exceeds {MAX_LENGTH} bytes')
+    buf[start - 2] = n >> 8
+    buf[start - 1] = n & 0xff
+    return pos
+
+def _begin_trap(buf, community, request_id, *values):
+    """Write the message and PDU headers; return (message, pdu, varbinds) starts
+    
+    values are the trap's variable-length inputs; buf is grown to fit them.
+    """
+    size = SCRATCH_SIZE + len(community) + sum(len(value) for value in values)
+    if len(buf) < size:
+        buf.extend(bytes(size - len(buf)))
+    message = _open(buf, 0, SEQUENCE)
+    pos = emit_integer(buf, message, 1)  # version: v2c
+    pos = emit_octets(buf, pos, community)
+    pdu = _open(buf, pos, SNMPV2_TRAP)
+    pos = emit_integer(buf, pdu, request_id)
+    pos = emit_integer(buf, pos, 0)  # error-status
+    pos = emit_integer(buf, pos, 0)  # error-index
+    return message, pdu, _open(buf, pos, SEQUENCE)
+
+def _end_trap(buf, starts, pos):
+    """Close every header opened by _begin_trap and return the message length"""
+    for start in reversed(starts):
+        _close(buf, start, pos)
+    return pos
+
+def _vb_integer(buf, pos, oid, val, tag=INTEGER):
+    start = _open(buf, pos, SEQUENCE)
+    pos = emit_integer(buf, emit_oid(buf, start, oid), val, tag)
+    return _close(buf, start, pos)
+
+def _vb_octets(buf, pos, oid, data, tag=OCTET_STRING):
+    start = _open(buf, pos, SEQUENCE)
+    pos = emit_octets(buf, emit_oid(buf, start, oid), data, tag)
+    return _close(buf, start, pos)
+
+def _vb_oid(buf, pos, oid, value):
+    start = _open(buf, pos, SEQUENCE)
+    pos = emit_oid(buf, emit_oid(buf, start, oid), value)
+    return _close(buf, start, pos)
+
+def _vb_notification(buf, pos, uptime, notification, trap):
+    """Write the leading sysUpTime/snmpTrapOID pairs in pysnmp's order"""
+    pos = _vb_integer(buf, pos, SYS_UPTIME, uptime, TIMETICKS)
+    pos = _vb_oid(buf, pos, SNMP_TRAP_OID, notification)
+    pos = _vb_integer(buf, pos, SYS_UPTIME, uptime, TIMETICKS)
+    return _vb_oid(buf, pos, SNMP_TRAP_OID, trap)
+
+SYS_UPTIME = compile_oid('1.3.6.1.2.1.1.3.0')
+SNMP_TRAP_OID = compile_oid('1.3.6.1.6.3.1.1.4.1.0')
+SYS_NAME = compile_oid('1.3.6.1.2.1.1.5.0')
+
+# *_NOTIFICATION is the NotificationType OID; *_TRAP the explicit snmpTrapOID value
+COLD_START_NOTIFICATION = compile_oid('1.3.6.1.6.3.1.1.5.1')
+COLD_START_TRAP = compile_oid('1.3.6.1.4.1.20408.4.1.1.2')
+
+SERVER_ALERT_NOTIFICATION = compile_oid('1.3.6.1.4.1.2021')
+SERVER_ALERT_TRAP = compile_oid('1.3.6.1.4.1.2021.251.1')
+SERVER_CPU = compile_oid('1.3.6.1.4.1.2021.11.11.0')
+SERVER_MEM_AVAIL = compile_oid('1.3.6.1.4.1.2021.4.6.0')
+SERVER_ALERT_MESSAGE = compile_oid('1.3.6.1.4.1.2021.251.1.1')
+
+LINK_DOWN_NOTIFICATION = compile_oid('1.3.6.1.6.3.1.1.5.3')
+LINK_DOWN_TRAP = compile_oid('1.3.6.1.6.3.1.1.5.3')
+IF_INDEX = compile_oid('1.3.6.1.2.1.2.2.1.1.2')
+IF_DESCR = compile_oid('1.3.6.1.2.1.2.2.1.2.2')
+IF_ADMIN_STATUS = compile_oid('1.3.6.1.2.1.2.2.1.7.2')
+IF_OPER_STATUS = compile_oid('1.3.6.1.2.1.2.2.1.8.2')
+
+CUSTOM_NOTIFICATION = compile_oid('1.3.6.1.4.1.99999.1.1')
+CUSTOM_TRAP = compile_oid('1.3.6.1.4.1.99999.1.1.1')
+CUSTOM_APPLICATION = compile_oid('1.3.6.1.4.1.99999.1.1.1')
+CUSTOM_CODE = compile_oid('1.3.6.1.4.1.99999.1.1.2')
+CUSTOM_MESSAGE = compile_oid('1.3.6.1.4.1.99999.1.1.3')
+CUSTOM_ADDRESS = compile_oid('1.3.6.1.4.1.99999.1.1.4')
+
+BURST_NOTIFICATION = compile_oid('1.3.6.1.4.1.99999.1.2')
+BURST_TRAP = compile_oid('1.3.6.1.4.1.99999.1.2.1')
+BURST_MESSAGE = compile_oid('1.3.6.1.4.1.99999.1.2.1')
+BURST_SEQUENCE = compile_oid('1.3.6.1.4.1.99999.1.2.2')
+
+def build_basic_trap(buf, community, request_id, uptime=12345):
+    """Encode the basic trap into buf and return its length"""
+    starts = _begin_trap(buf, community, request_id)
+    pos = _vb_notification(buf, starts[-1], uptime, COLD_START_NOTIFICATION, COLD_START_TRAP)
+    return _end_trap(buf, starts, pos)
+
+def build_server_alert_trap(buf, community, request_id, uptime, cpu, mem, hostname,
+                            message=b'High CPU usage detected'):
+    """Encode the server alert trap into buf and return its length"""
+    starts = _begin_trap(buf, community, request_id, hostname, message)
+    pos = _vb_notification(buf, starts[-1], uptime, SERVER_ALERT_NOTIFICATION, SERVER_ALERT_TRAP)
+    pos = _vb_octets(buf, pos, SYS_NAME, hostname)
+    pos = _vb_integer(buf, pos, SERVER_CPU, cpu)
+    pos = _vb_integer(buf, pos, SERVER_MEM_AVAIL, mem)
+    pos = _vb_octets(buf, pos, SERVER_ALERT_MESSAGE, message)
+    return _end_trap(buf, starts, pos)
+
+def build_interface_down_trap(buf, community, request_id, uptime=789012, if_index=2,
+                              if_descr=b'GigabitEthernet0/2'):
+    """Encode the interface down (linkDown) trap into buf and return its length"""
+    starts = _begin_trap(buf, community, request_id, if_descr)
+    pos = _vb_notification(buf, starts[-1], uptime, LINK_DOWN_NOTIFICATION, LINK_DOWN_TRAP)
+    pos = _vb_integer(buf, pos, IF_INDEX, if_index)
+    pos = _vb_octets(buf, pos, IF_DESCR, if_descr)
+    pos = _vb_integer(buf, pos, IF_ADMIN_STATUS, 2)  # down
+    pos = _vb_integer(buf, pos, IF_OPER_STATUS, 2)  # down
+    return _end_trap(buf, starts, pos)
+
+def build_custom_enterprise_trap(buf, community, request_id, uptime=987654):
+    """Encode the custom enterprise trap into buf and return its length"""
+    starts = _begin_trap(buf, community, request_id)
+    pos = _vb_notification(buf, starts[-1], uptime, CUSTOM_NOTIFICATION, CUSTOM_TRAP)
+    pos = _vb_octets(buf, pos, CUSTOM_APPLICATION, b'OIDyssey Test Application')
+    pos = _vb_integer(buf, pos, CUSTOM_CODE, 42)
+    pos = _vb_octets(buf, pos, CUSTOM_MESSAGE, b'Test trap from OIDyssey test suite')
+    pos = _vb_octets(buf, pos, CUSTOM_ADDRESS, bytes([192, 168, 1, 100]), IP_ADDRESS)
+    return _end_trap(buf, starts, pos)
+
+def build_burst_trap(buf, community, request_id, uptime, seq):
+    """Encode burst trap number seq into buf and return its length"""
+    starts = _begin_trap(buf, community, request_id)
+    pos = _vb_notification(buf, starts[-1], uptime, BURST_NOTIFICATION, BURST_TRAP)
+    pos = _vb_octets(buf, pos, BURST_MESSAGE, b'Burst test trap #%d' % seq)
+    pos = _vb_integer(buf, pos, BURST_SEQUENCE, seq)
+    return _end_trap(buf, starts, pos)
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Precomputed SNMPv2c payloads for the fixed traps in trap-sender.py
+
+The basic, server alert, interface down and custom enterprise traps carry the
+same varbinds on every send, so each is encoded once per community with
+encode_trap and reused as-is. Burst traps change with every send and are
+encoded per trap by encode_trap.build_burst_trap instead.
+"""
+
+import random
+
+import encode_trap
+
+def _build_server_alert_trap(buf, community, request_id):
+    return encode_trap.build_server_alert_trap(
+        buf, community, request_id, 456789, 95, 1024, b'server01.company.com'
+    )
+
+_BUILDERS = {
+    'basic': encode_trap.build_basic_trap,
+    'server': _build_server_alert_trap,
+    'interface': encode_trap.build_interface_down_trap,
+    'custom': encode_trap.build_custom_enterprise_trap,
+}
+
+# (name, community) -> encoded trap
+_payloads = {}
+
+def payload(name, community):
+    """Return the encoded trap called name for community, encoding it on first use
+
+    Each payload keeps the request-id it was built with; nothing answers an
+    SNMPv2c trap, so repeated sends don't need a fresh one.
+    """
+    key = (name, community)
+    data = _payloads.get(key)
+    if data is None:
+        buf = encode_trap.new_buffer()
+        n = _BUILDERS[name](buf, community.encode(), random.randrange(1 << 30))
+        data = _payloads[key] = bytes(buf[:n])
+    return data
@@ -2,49 +2,98 @@
 """
 Simple SNMP trap sender for testing the OIDyssey trap receiver
 """
+import os
+import errno
+import ctypes
+import select
 import socket
-import time
-import struct
+
+# Basic SNMP v1 trap message (simplified). The content never changes, so it
+# is assembled once at import time rather than on every send.
+# In a real implementation, you'd use a proper SNMP library like pysnmp
+_STATIC_TRAP = (
+    b'\x30\x82\x00\x4a'                       # SEQUENCE, length
+    b'\x02\x01\x00'                           # version (v1 = 0)
+    b'\x04\x06public'                         # community string
+    b'\xa4\x3d'                               # trap PDU
+    b'\x06\x08\x2b\x06\x01\x04\x01\xce\x0f'   # Enterprise OID (1.3.6.1.4.1.9999)
+    b'\x40\x04\x7f\x00\x00\x01'               # Agent address (127.0.0.1)
+    b'\x02\x01\x06'                           # Generic trap (6 = enterpriseSpecific)
+    b'\x02\x01\x01'                           # Specific trap (1)
+    b'\x43\x04\x12\x34\x56\x78'               # Timestamp
+    b'\x30\x00'                               # Varbind list (empty for simplicity)
+)
+
+# Send buffer requested for every socket. Linux caps SO_SNDBUF at
+# net.core.wmem_max (208 KiB by default), so raise it to get the full size:
+#   sysctl -w net.core.wmem_max=4194304
+_SNDBUF = 4 << 20
+
+# MSG_CONFIRM skips ARP re-validation of the receiver; Linux only
+_SEND_FLAGS = getattr(socket, 'MSG_CONFIRM', 0)
+
+# Priority used to classify the test traffic (SO_PRIORITY, Linux only)
+_PRIORITY = 6
+
+# Connected UDP sockets shared by send_test_trap() calls, keyed by (host, port)
+_sockets = {}
 
 def create_simple_snmp_trap():
     """Create a basic SNMP v1 trap message"""
-    # This is a simplified SNMP trap message for testing
-    # In a real implementation, you'd use a proper SNMP library like pysnmp
-    
-    # Basic SNMP message structure (simplified)
-    message = bytearray()
-    
-    # SNMP message header (simplified)
-    message.extend(b'\x30\x82\x00\x4a')  # SEQUENCE, length
-    message.extend(b'\x02\x01\x00')      # version (v1 = 0)
-    message.extend(b'\x04\x06public')    # community string
-    message.extend(b'\xa4\x3d')          # trap PDU
-    
-    # Enterprise OID (1.3.6.1.4.1.9999)
-    message.extend(b'\x06\x08\x2b\x06\x01\x04\x01\xce\x0f')
-    
-    # Agent address (127.0.0.1)
-    message.extend(b'\x40\x04\x7f\x00\x00\x01')
-    
-    # Generic trap (6 = enterpriseSpecific)
-    message.extend(b'\x02\x01\x06')
-    
-    # Specific trap (1)
-    message.extend(b'\x02\x01\x01')
-    
-    # Timestamp
-    message.extend(b'\x43\x04\x12\x34\x56\x78')
-    
-    # Varbind list (empty for simplicity)
-    message.extend(b'\x30\x00')
+    return _STATIC_TRAP
+
+def _new_socket(addr):
+    """Create a non-blocking UDP socket tuned for sending many traps, connected to addr
     
-    return bytes(message)
+    Connecting resolves the destination and its route once, so every
+    send() afterwards skips the per-datagram address handling of sendto().
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, _SNDBUF)
+    if hasattr(socket, 'SO_PRIORITY'):
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_PRIORITY, _PRIORITY)
+    sock.connect(addr)
+    sock.setblocking(False)
+    return sock
 
-def send_test_trap(host='127.0.0.1', port=1162):
-    """Send a test SNMP trap"""
+def _get_socket(host, port):
+    """Return the shared socket connected to host:port, creating it on first use"""
+    sock = _sockets.get((host, port))
+    if sock is None:
+        sock = _sockets[(host, port)] = _new_socket((host, port))
+    return sock
+
+def _is_connected(sock):
+    """Return whether sock already has a peer address"""
     try:
-        # Create UDP socket
-        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.getpeername()
+    except OSError:
+        return False
+    return True
+
+def _send(sock, payload):
+    """Send one datagram on a connected non-blocking socket, waiting if the buffer is full"""
+    while True:
+        try:
+            return sock.send(payload, _SEND_FLAGS)
+        except BlockingIOError:
+            select.select([], [sock], [])
+        except ConnectionRefusedError:
+            # An ICMP error for an earlier datagram surfaced on this send;
+            # unconnected sendto() ignores those, so just try again
+            pass
+
+def send_test_trap(host='127.0.0.1', port=1162, sock=None):
+    """Send a test SNMP trap, on sock if given or else a shared socket
+    
+    A caller's socket that isn't connected yet is connected to host:port.
+    """
+    try:
+        # Reuse the UDP socket
+        if sock is None:
+            sock = _get_socket(host, port)
+        elif not _is_connected(sock):
+            sock.connect((host, port))
         
         # Create trap message
         trap_message = create_simple_snmp_trap()
@@ -53,32 +102,117 @@ def send_test_trap(host='127.0.0.1', port=1162):
         print(f"Message length: {len(trap_message)} bytes")
         
         # Send the trap
-        sock.sendto(trap_message, (host, port))
+        _send(sock, trap_message)
         print(">>> Test trap sent successfully!")
         
-        sock.close()
-        
     except Exception as e:
         print(f"ERROR: Error sending trap: {e}")
 
+# Linux limits a single sendmmsg() call to UIO_MAXIOV messages
+_MMSG_BATCH = 1024
+
+class _Iovec(ctypes.Structure):
+    _fields_ = [('iov_base', ctypes.c_void_p), ('iov_len', ctypes.c_size_t)]
+
+class _Msghdr(ctypes.Structure):
+    _fields_ = [
+        ('msg_name', ctypes.c_void_p),
+        ('msg_namelen', ctypes.c_uint32),
+        ('msg_iov', ctypes.POINTER(_Iovec)),
+        ('msg_iovlen', ctypes.c_size_t),
+        ('msg_control', ctypes.c_void_p),
+        ('msg_controllen', ctypes.c_size_t),
+        ('msg_flags', ctypes.c_int)
+    ]
+
+class _Mmsghdr(ctypes.Structure):
+    _fields_ = [('msg_hdr', _Msghdr), ('msg_len', ctypes.c_uint)]
+
+def _load_sendmmsg():
+    """Return libc's sendmmsg(), or None where it isn't available"""
+    if os.name != 'posix':
+        return None
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        sendmmsg = libc.sendmmsg
+    except (OSError, AttributeError):
+        return None
+    sendmmsg.argtypes = [ctypes.c_int, ctypes.POINTER(_Mmsghdr), ctypes.c_uint, ctypes.c_int]
+    sendmmsg.restype = ctypes.c_int
+    return sendmmsg
+
+def _batch_send(sock, n, payload):
+    """Send n datagrams one send() at a time"""
+    for _ in range(n):
+        _send(sock, payload)
+    return n
+
+def _batch_sendmmsg(sock, sendmmsg, n, payload):
+    """Send n datagrams up to _MMSG_BATCH per syscall"""
+    # Every message points at the same payload; the socket is connected,
+    # so msg_name stays NULL
+    data = ctypes.create_string_buffer(payload, len(payload))
+    iov = _Iovec(ctypes.cast(data, ctypes.c_void_p), len(payload))
+    
+    msgs = (_Mmsghdr * min(n, _MMSG_BATCH))()
+    for msg in msgs:
+        msg.msg_hdr.msg_iov = ctypes.pointer(iov)
+        msg.msg_hdr.msg_iovlen = 1
+    
+    fd = sock.fileno()
+    sent = 0
+    while sent < n:
+        result = sendmmsg(fd, msgs, min(len(msgs), n - sent), _SEND_FLAGS)
+        if result < 0:
+            err = ctypes.get_errno()
+            if err == errno.ECONNREFUSED:
+                continue  # ICMP error for an earlier datagram, as in _send()
+            if err not in (errno.EAGAIN, errno.EWOULDBLOCK):
+                raise OSError(err, os.strerror(err))
+            select.select([], [sock], [])
+            continue
+        sent += result
+    return sent
+
+def send_test_trap_batch(host='127.0.0.1', port=1162, n=1000, payload=_STATIC_TRAP):
+    """Send n copies of a trap as fast as the socket accepts them"""
+    try:
+        with _new_socket((host, port)) as sock:
+            sendmmsg = _load_sendmmsg()
+            if sendmmsg is not None:
+                sent = _batch_sendmmsg(sock, sendmmsg, n, payload)
+            else:
+                sent = _batch_send(sock, n, payload)
+    except OSError as e:
+        print(f"ERROR: Error sending traps: {e}")
+        return 0
+    
+    print(f">>> Sent {sent} test traps to {host}:{port}")
+    return sent
+
 if __name__ == "__main__":
     import sys
     
     host = sys.argv[1] if len(sys.argv) > 1 else '127.0.0.1'
     port = int(sys.argv[2]) if len(sys.argv) > 2 else 1162
+    count = int(sys.argv[3]) if len(sys.argv) > 3 else 0
     
     print("*** SNMP Trap Sender Test ***")
     print(f"Target: {host}:{port}")
     print("-" * 40)
     
-    # Send a single test trap
-    send_test_trap(host, port)
-    
-    # Wait a moment
-    time.sleep(1)
+    # Both traps share one socket; send_test_trap connects it on first use
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        # Send a single test trap
+        send_test_trap(host, port, sock)
+        
+        # Send another trap with different content
+        print("\nSending second test trap...")
+        send_test_trap(host, port, sock)
     
-    # Send another trap with different content
-    print("\nSending second test trap...")
-    send_test_trap(host, port)
+    # Optional third argument: blast that many traps for receiver benchmarking
+    if count > 0:
+        print(f"\nSending batch of {count} test traps...")
+        send_test_trap_batch(host, port, count)
     
     print("\n*** Test completed! Check your n8n workflow for received traps. ***")
\ No newline at end of file
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Tests for encode_trap.py: every build_* output must decode with pysnmp as
+the intended SNMPv2c trap
+"""
+
+import pytest
+from pyasn1.codec.ber import decoder
+from pysnmp.proto import api
+
+import encode_trap
+
+def _decode(buf, n):
+    """Decode an encoded trap into (community, request-id, varbinds)"""
+    message, rest = decoder.decode(bytes(buf[:n]), asn1Spec=api.v2c.Message())
+    assert rest == b''
+    pdu = api.v2c.apiMessage.getPDU(message)
+    assert pdu.tagSet == api.v2c.SNMPv2TrapPDU.tagSet
+    varbinds = [(str(oid), value.__class__.__name__, value.prettyPrint())
+                for oid, value in api.v2c.apiPDU.getVarBinds(pdu)]
+    return bytes(api.v2c.apiMessage.getCommunity(message)), int(api.v2c.apiPDU.getRequestID(pdu)), varbinds
+
+def test_basic_trap():
+    buf = encode_trap.new_buffer()
+    n = encode_trap.build_basic_trap(buf, b'public', 1)
+    assert _decode(buf, n) == (b'public', 1, [
+        ('1.3.6.1.2.1.1.3.0', 'TimeTicks', '12345'),
+        ('1.3.6.1.6.3.1.1.4.1.0', 'ObjectIdentifier', '1.3.6.1.6.3.1.1.5.1'),
+        ('1.3.6.1.2.1.1.3.0', 'TimeTicks', '12345'),
+        ('1.3.6.1.6.3.1.1.4.1.0', 'ObjectIdentifier', '1.3.6.1.4.1.20408.4.1.1.2'),
+    ])
+
+def test_server_alert_trap():
+    buf = encode_trap.new_buffer()
+    n = encode_trap.build_server_alert_trap(buf, b'secret', 0x12345678, 456789, 95, 1024, b'server01.company.com')
+    assert _decode(buf, n) == (b'secret', 0x12345678, [
+        ('1.3.6.1.2.1.1.3.0', 'TimeTicks', '456789'),
+        ('1.3.6.1.6.3.1.1.4.1.0', 'ObjectIdentifier', '1.3.6.1.4.1.2021'),
+        ('1.3.6.1.2.1.1.3.0', 'TimeTicks', '456789'),
+        ('1.3.6.1.6.3.1.1.4.1.0', 'ObjectIdentifier', '1.3.6.1.4.1.2021.251.1'),
+        ('1.3.6.1.2.1.1.5.0', 'OctetString', 'server01.company.com'),
+        ('1.3.6.1.4.1.2021.11.11.0', 'Integer', '95'),
+        ('1.3.6.1.4.1.2021.4.6.0', 'Integer', '1024'),
+        ('1.3.6.1.4.1.2021.251.1.1', 'OctetString', 'High CPU usage detected'),
+    ])
+
+def test_interface_down_trap():
+    buf = encode_trap.new_buffer()
+    n = encode_trap.build_interface_down_trap(buf, b'public', 7)
+    assert _decode(buf, n) == (b'public', 7, [
+        ('1.3.6.1.2.1.1.3.0', 'TimeTicks', '789012'),
+        ('1.3.6.1.6.3.1.1.4.1.0', 'ObjectIdentifier', '1.3.6.1.6.3.1.1.5.3'),
+        ('1.3.6.1.2.1.1.3.0', 'TimeTicks', '789012'),
+        ('1.3.6.1.6.3.1.1.4.1.0', 'ObjectIdentifier', '1.3.6.1.6.3.1.1.5.3'),
+        ('1.3.6.1.2.1.2.2.1.1.2', 'Integer', '2'),
+        ('1.3.6.1.2.1.2.2.1.2.2', 'OctetString', 'GigabitEthernet0/2'),
+        ('1.3.6.1.2.1.2.2.1.7.2', 'Integer', '2'),
+        ('1.3.6.1.2.1.2.2.1.8.2', 'Integer', '2'),
+    ])
+
+def test_custom_enterprise_trap():
+    buf = encode_trap.new_buffer()
+    n = encode_trap.build_custom_enterprise_trap(buf, b'public', 1234)
+    assert _decode(buf, n) == (b'public', 1234, [
+        ('1.3.6.1.2.1.1.3.0', 'TimeTicks', '987654'),
+        ('1.3.6.1.6.3.1.1.4.1.0', 'ObjectIdentifier', '1.3.6.1.4.1.99999.1.1'),
+        ('1.3.6.1.2.1.1.3.0', 'TimeTicks', '987654'),
+        ('1.3.6.1.6.3.1.1.4.1.0', 'ObjectIdentifier', '1.3.6.1.4.1.99999.1.1.1'),
+        ('1.3.6.1.4.1.99999.1.1.1', 'OctetString', 'OIDyssey Test Application'),
+        ('1.3.6.1.4.1.99999.1.1.2', 'Integer', '42'),
+        ('1.3.6.1.4.1.99999.1.1.3', 'OctetString', 'Test trap from OIDyssey test suite'),
+        ('1.3.6.1.4.1.99999.1.1.4', 'IpAddress', '192.168.1.100'),
+    ])
+
+@pytest.mark.parametrize('seq', [1, 128, 70000])
+def test_burst_trap(seq):
+    buf = encode_trap.new_buffer()
+    n = encode_trap.build_burst_trap(buf, b'public', 99, 100000 + (seq - 1) * 1000, seq)
+    assert _decode(buf, n) == (b'public', 99, [
+        ('1.3.6.1.2.1.1.3.0', 'TimeTicks', str(100000 + (seq - 1) * 1000)),
+        ('1.3.6.1.6.3.1.1.4.1.0', 'ObjectIdentifier', '1.3.6.1.4.1.99999.1.2'),
+        ('1.3.6.1.2.1.1.3.0', 'TimeTicks', str(100000 + (seq - 1) * 1000)),
+        ('1.3.6.1.6.3.1.1.4.1.0', 'ObjectIdentifier', '1.3.6.1.4.1.99999.1.2.1'),
+        ('1.3.6.1.4.1.99999.1.2.1', 'OctetString', f'Burst test trap #{seq}'),
+        ('1.3.6.1.4.1.99999.1.2.2', 'Integer', str(seq)),
+    ])
+
+def test_reused_buffer_only_holds_latest_trap():
+    buf = encode_trap.new_buffer()
+    encode_trap.build_server_alert_trap(buf, b'public', 1, 1, 1, 1, b'a much longer hostname than the next one')
+    n = encode_trap.build_burst_trap(buf, b'public', 2, 3, 4)
+    assert _decode(buf, n)[2][-1] == ('1.3.6.1.4.1.99999.1.2.2', 'Integer', '4')
+
+def test_long_values_grow_the_buffer():
+    buf = encode_trap.new_buffer()
+    hostname = b'h' * 2000
+    n = encode_trap.build_server_alert_trap(buf, b'c' * 300, 1, 1, 1, 1, hostname, b'm' * 1000)
+    assert n > encode_trap.SCRATCH_SIZE
+    community, _, varbinds = _decode(buf, n)
+    assert community == b'c' * 300
+    assert varbinds[4] == ('1.3.6.1.2.1.1.5.0', 'OctetString', hostname.decode())
+
+def test_oversize_trap_is_rejected():
+    buf = encode_trap.new_buffer()
+    with pytest.raises(ValueError):
+        encode_trap.build_server_alert_trap(buf, b'public', 1, 1, 1, 1, b'h' * 70000)
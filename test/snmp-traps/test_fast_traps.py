@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Tests for --fast in trap-sender.py: the precomputed and directly encoded
+traps must carry the same varbinds as the ones pysnmp sends by default
+"""
+
+import os
+import socket
+import importlib.util
+
+import pytest
+from pyasn1.codec.ber import decoder
+from pysnmp.proto import api
+
+import fast_traps
+
+COMMUNITY = 'public'
+
+@pytest.fixture(scope='module')
+def trap_sender():
+    """Import trap-sender.py, whose name isn't a valid module name"""
+    path = os.path.join(os.path.dirname(__file__), 'trap-sender.py')
+    spec = importlib.util.spec_from_file_location('trap_sender', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+@pytest.fixture
+def receiver():
+    """UDP socket on an ephemeral localhost port standing in for the trap receiver"""
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        sock.settimeout(5)
+        yield sock
+
+def _varbinds(datagram):
+    """Decode an SNMPv2c trap and return its community and varbinds"""
+    message, _ = decoder.decode(bytes(datagram), asn1Spec=api.v2c.Message())
+    pdu = api.v2c.apiMessage.getPDU(message)
+    return bytes(api.v2c.apiMessage.getCommunity(message)), [
+        (str(oid), value.__class__.__name__, value.prettyPrint())
+        for oid, value in api.v2c.apiPDU.getVarBinds(pdu)
+    ]
+
+@pytest.mark.parametrize('name, sender', [
+    ('basic', 'send_basic_trap'),
+    ('server', 'send_server_alert_trap'),
+    ('interface', 'send_interface_down_trap'),
+    ('custom', 'send_custom_enterprise_trap'),
+])
+def test_fast_payload_matches_pysnmp(trap_sender, receiver, name, sender):
+    host, port = receiver.getsockname()
+    assert getattr(trap_sender, sender)(host, port, COMMUNITY)
+    pysnmp_trap = receiver.recv(65535)
+
+    assert _varbinds(fast_traps.payload(name, COMMUNITY)) == _varbinds(pysnmp_trap)
+
+def test_fast_burst_matches_pysnmp(trap_sender, receiver):
+    host, port = receiver.getsockname()
+    count = 3
+    assert trap_sender.send_trap_burst(host, port, COMMUNITY, count, 0) == count
+    pysnmp_traps = [receiver.recv(65535) for _ in range(count)]
+    assert trap_sender.send_trap_burst(host, port, COMMUNITY, count, 0, fast=True) == count
+    fast_traps_sent = [receiver.recv(65535) for _ in range(count)]
+
+    assert [_varbinds(trap) for trap in fast_traps_sent] == [_varbinds(trap) for trap in pysnmp_traps]
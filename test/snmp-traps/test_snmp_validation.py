@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Tests for test/snmp-validation.py against in-process pysnmp agents: walks
+must stop at the end of their prefix, fall back to GETNEXT over SNMPv1 for
+v1-only agents, and report unreachable agents without sending requests
+"""
+
+import os
+import socket
+import threading
+import importlib.util
+
+import pytest
+from pysnmp.entity import engine, config
+from pysnmp.entity.rfc3413 import cmdrsp, context
+from pysnmp.carrier.asyncore.dgram import udp
+
+SYSTEM = (1, 3, 6, 1, 2, 1, 1)
+
+@pytest.fixture(scope='module')
+def snmp_validation():
+    """Import snmp-validation.py, whose name isn't a valid module name"""
+    path = os.path.join(os.path.dirname(__file__), os.pardir, 'snmp-validation.py')
+    spec = importlib.util.spec_from_file_location('snmp_validation', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def _agent(v1_only=False):
+    """Serve the SNMPv2-MIB with community 'public' on an ephemeral localhost port
+
+    Yields the port while the agent's dispatcher runs in a background thread.
+    """
+    snmpEngine = engine.SnmpEngine()
+    transport = udp.UdpTransport().openServerMode(('127.0.0.1', 0))
+    config.addTransport(snmpEngine, udp.domainName, transport)
+    config.addV1System(snmpEngine, 'area', 'public')
+    for mpModel in (1, 2):
+        config.addVacmUser(snmpEngine, mpModel, 'area', 'noAuthNoPriv', (1, 3, 6), (1, 3, 6))
+    if v1_only:
+        # Drop the SNMPv2c message processing model; v2c requests go unanswered
+        del snmpEngine.messageProcessingSubsystems[1]
+    snmpContext = context.SnmpContext(snmpEngine)
+    cmdrsp.GetCommandResponder(snmpEngine, snmpContext)
+    cmdrsp.NextCommandResponder(snmpEngine, snmpContext)
+    cmdrsp.BulkCommandResponder(snmpEngine, snmpContext)
+
+    dispatcher = snmpEngine.transportDispatcher
+    dispatcher.jobStarted('agent')
+    thread = threading.Thread(target=dispatcher.runDispatcher, daemon=True)
+    thread.start()
+    try:
+        yield transport.socket.getsockname()[1]
+    finally:
+        dispatcher.jobFinished('agent')
+        thread.join()
+        dispatcher.closeDispatcher()
+
+@pytest.fixture(scope='module')
+def agent():
+    yield from _agent()
+
+@pytest.fixture(scope='module')
+def v1_agent():
+    yield from _agent(v1_only=True)
+
+@pytest.fixture
+def closed_port():
+    """A localhost UDP port nothing listens on"""
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def test_get_single_oid_returns_bool(snmp_validation, agent):
+    validator = snmp_validation.SNMPValidator('127.0.0.1', agent)
+    assert validator.test_snmp_get('1.3.6.1.2.1.1.1.0') is True
+    assert validator.test_snmp_get(['1.3.6.1.2.1.1.1.0', '1.3.6.1.2.1.1.3.0']) == [True, True]
+
+def test_walk_stops_at_prefix_boundary(snmp_validation, agent):
+    validator = snmp_validation.SNMPValidator('127.0.0.1', agent)
+    assert validator.test_snmp_walk('1.3.6.1.2.1.1')
+    assert validator.test_snmp_walk('1.3.6.1.2.1')
+    system, mib2 = validator.results['tests']
+
+    assert system.error is None
+    assert system.oids and all(oid[:len(SYSTEM)] == SYSTEM for oid in system.oids)
+    assert system.oids == sorted(system.oids)
+    # The agent serves more than the system group, so the walk did stop early
+    assert mib2.count > system.count
+    assert mib2.oids[:system.count] == system.oids
+    assert validator._bulk_supported is True
+
+def test_walk_falls_back_to_v1(snmp_validation, agent, v1_agent):
+    validator = snmp_validation.SNMPValidator('127.0.0.1', v1_agent)
+    assert validator.test_snmp_walk('1.3.6.1.2.1.1')
+    assert validator._bulk_supported is False
+    walk = validator.results['tests'][0]
+
+    reference = snmp_validation.SNMPValidator('127.0.0.1', agent)
+    reference.test_snmp_walk('1.3.6.1.2.1.1')
+    # sysUpTime differs between the agents, so compare names only
+    assert walk.oids == reference.results['tests'][0].oids
+
+def test_unreachable_agent(snmp_validation, closed_port):
+    validator = snmp_validation.SNMPValidator('127.0.0.1', closed_port)
+    assert validator.test_snmp_get('1.3.6.1.2.1.1.1.0') is False
+    assert not validator.test_snmp_walk('1.3.6.1.2.1.1')
+    assert not validator.test_snmp_bulk('1.3.6.1.2.1.1')
+    assert not validator.test_snmp_set('1.3.6.1.2.1.1.4.0', 'admin')
+    assert [(test.operation, test.success, test.error) for test in validator.results['tests']] == [
+        ('GET', False, 'unreachable'),
+        ('WALK', False, 'unreachable'),
+        ('BULK', False, 'unreachable'),
+        ('SET', False, 'unreachable'),
+    ]
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Tests for test-trap-sender.py: the static trap must reach the receiver on
+shared, caller-supplied and batch sockets, and from the command line
+"""
+
+import os
+import sys
+import socket
+import subprocess
+import importlib.util
+
+import pytest
+
+@pytest.fixture(scope='module')
+def sender():
+    """Import test-trap-sender.py, whose name isn't a valid module name"""
+    path = os.path.join(os.path.dirname(__file__), 'test-trap-sender.py')
+    spec = importlib.util.spec_from_file_location('test_trap_sender_script', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+@pytest.fixture
+def receiver():
+    """UDP socket on an ephemeral localhost port standing in for the trap receiver"""
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        sock.settimeout(5)
+        yield sock
+
+def test_shared_socket(sender, receiver, capsys):
+    host, port = receiver.getsockname()
+    sender.send_test_trap(host, port)
+    assert receiver.recv(65535) == sender.create_simple_snmp_trap()
+    assert 'ERROR' not in capsys.readouterr().out
+
+def test_unconnected_caller_socket(sender, receiver, capsys):
+    host, port = receiver.getsockname()
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sender.send_test_trap(host, port, sock)
+        sender.send_test_trap(host, port, sock)
+    assert [receiver.recv(65535) for _ in range(2)] == [sender.create_simple_snmp_trap()] * 2
+    assert 'ERROR' not in capsys.readouterr().out
+
+def test_batch(sender, receiver):
+    host, port = receiver.getsockname()
+    assert sender.send_test_trap_batch(host, port, 3) == 3
+    assert [receiver.recv(65535) for _ in range(3)] == [sender.create_simple_snmp_trap()] * 3
+
+def _run_script(*args):
+    script = os.path.join(os.path.dirname(__file__), 'test-trap-sender.py')
+    return subprocess.run([sys.executable, script, *map(str, args)],
+                          capture_output=True, text=True, timeout=30)
+
+def test_main_sends_two_traps(sender, receiver):
+    host, port = receiver.getsockname()
+    result = _run_script(host, port)
+    assert result.returncode == 0, result.stderr
+    assert [receiver.recv(65535) for _ in range(2)] == [sender.create_simple_snmp_trap()] * 2
+
+def test_main_reports_unresolvable_host():
+    result = _run_script('nonexistent.invalid', 1162)
+    assert result.returncode == 0
+    assert 'Traceback' not in result.stderr
+    assert result.stdout.count('ERROR: Error sending trap:') == 2
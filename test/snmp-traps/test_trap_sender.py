@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Tests for trap-sender.py burst pacing: paced bursts must keep their
+interval between traps on the wire
+"""
+
+import os
+import time
+import socket
+import threading
+import importlib.util
+
+import pytest
+
+@pytest.fixture(scope='module')
+def trap_sender():
+    """Import trap-sender.py, whose name isn't a valid module name"""
+    path = os.path.join(os.path.dirname(__file__), 'trap-sender.py')
+    spec = importlib.util.spec_from_file_location('trap_sender', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+@pytest.fixture
+def arrivals():
+    """Localhost UDP receiver recording the arrival time of every datagram
+
+    Yields (address, times); times fills in from a background thread.
+    """
+    times = []
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(('127.0.0.1', 0))
+    sock.settimeout(0.1)
+    done = threading.Event()
+
+    def receive():
+        while not done.is_set():
+            try:
+                sock.recv(65535)
+            except socket.timeout:
+                continue
+            times.append(time.perf_counter())
+
+    thread = threading.Thread(target=receive, daemon=True)
+    thread.start()
+    try:
+        yield sock.getsockname(), times
+    finally:
+        done.set()
+        thread.join()
+        sock.close()
+
+@pytest.mark.parametrize('fast', [False, True])
+def test_paced_burst_keeps_interval(trap_sender, arrivals, fast):
+    (host, port), times = arrivals
+    count, interval = 4, 0.7
+    assert trap_sender.send_trap_burst(host, port, 'public', count, interval, fast) == count
+
+    deadline = time.perf_counter() + 2
+    while len(times) < count and time.perf_counter() < deadline:
+        time.sleep(0.01)
+    assert len(times) == count
+
+    gaps = [b - a for a, b in zip(times, times[1:])]
+    # A 0.7s interval used to tick the dispatcher every 0.5s, so traps came
+    # out 1s and 0.5s apart instead of every 0.7s
+    assert min(gaps) >= interval - 0.02, gaps
+    assert max(gaps) <= interval + 0.1, gaps
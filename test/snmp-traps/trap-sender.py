@@ -5,166 +5,368 @@ SNMP Trap Sender for Testing OIDyssey SNMP Trap Trigger Node
 This script sends various types of SNMP traps to test the trigger node functionality.
 """
 
+import os
 import sys
 import time
+import random
+import socket
 import argparse
+import functools
+import itertools
+import multiprocessing
 from pysnmp.hlapi import *
+from pysnmp.hlapi.asyncore import ntforg as async_ntforg
+from pysnmp.hlapi.varbinds import NotificationOriginatorVarBinds
 
-def send_basic_trap(target_host='127.0.0.1', target_port=162, community='public'):
-    """Send a basic SNMP v2c trap"""
-    print(f"Sending basic trap to {target_host}:{target_port}")
+import encode_trap
+import fast_traps
+
+# One engine and context for the whole run; communities and transport
+# targets are cached so repeated traps don't re-bootstrap pysnmp
+_ENGINE = SnmpEngine()
+_CTX = ContextData()
+_community_cache = {}
+_target_cache = {}
+
+@functools.lru_cache(maxsize=256)
+def _oid(oid):
+    """Return a shared ObjectIdentity so each OID is parsed and MIB-resolved once"""
+    return ObjectIdentity(oid)
+
+# Varbind names carried by every trap
+SYS_UPTIME = _oid('1.3.6.1.2.1.1.3.0')
+SNMP_TRAP_OID = _oid('1.3.6.1.6.3.1.1.4.1.0')
+
+# State for --fast, which sends fast_traps payloads or encodes burst traps
+# with encode_trap and skips pysnmp
+_SCRATCH = encode_trap.new_buffer()
+_request_ids = itertools.count(random.randrange(1 << 30))
+_raw_sockets = {}  # (host, port) -> connected UDP socket
+
+# Burst traps differ only in sysUpTime, message and sequence number, so the
+# notification is resolved once and just those values are cloned per trap
+_burst_template = None
+_BURST_FIELDS = (1, 3, 4)  # indexes after NotificationType prepends snmpTrapOID
+
+# Unpaced bursts of at least this many traps are split across processes
+_POOL_THRESHOLD = 1000
+_POOL_MAX_PROCS = 8
+
+def _lookup(host, port, community):
+    """Return the cached community and transport target for a destination"""
+    auth = _community_cache.get(community)
+    if auth is None:
+        auth = _community_cache[community] = CommunityData(community)
+    target = _target_cache.get((host, port))
+    if target is None:
+        target = _target_cache[(host, port)] = UdpTransportTarget((host, port))
+    return auth, target
+
+def _notification(notif_oid, varbinds):
+    """Build a NotificationType from cached OID identities"""
+    return NotificationType(_oid(notif_oid)).addVarBinds(
+        *[ObjectType(_oid(name) if isinstance(name, str) else name, value) for name, value in varbinds]
+    )
+
+def _send(notif_oid, varbinds, host, port, community):
+    """Send a v2c trap through the shared engine"""
+    auth, target = _lookup(host, port, community)
     
-    for (errorIndication, errorStatus, errorIndex, varBinds) in sendNotification(
-        SnmpEngine(),
-        CommunityData(community),
-        UdpTransportTarget((target_host, target_port)),
-        ContextData(),
+    return next(sendNotification(
+        _ENGINE,
+        auth,
+        target,
+        _CTX,
         'trap',
-        NotificationType(
-            ObjectIdentity('1.3.6.1.6.3.1.1.5.1')  # coldStart trap
-        ).addVarBinds(
-            ('1.3.6.1.2.1.1.3.0', TimeTicks(12345)),  # sysUpTime
-            ('1.3.6.1.6.3.1.1.4.1.0', ObjectIdentifier('1.3.6.1.4.1.20408.4.1.1.2'))
+        _notification(notif_oid, varbinds)
+    ))
+
+def _burst_varbinds(i):
+    """Return the varbinds of burst trap i, cloned from the resolved template"""
+    global _burst_template
+    if _burst_template is None:
+        _burst_template = NotificationOriginatorVarBinds().makeVarBinds(
+            _ENGINE,
+            _notification('1.3.6.1.4.1.99999.1.2', [
+                (SYS_UPTIME, TimeTicks(0)),
+                (SNMP_TRAP_OID, ObjectIdentifier('1.3.6.1.4.1.99999.1.2.1')),
+                ('1.3.6.1.4.1.99999.1.2.1', OctetString('')),
+                ('1.3.6.1.4.1.99999.1.2.2', Integer(0))
+            ])
         )
-    ):
-        if errorIndication:
-            print(f"Error: {errorIndication}")
-            return False
-        elif errorStatus:
-            print(f'Error: {errorStatus.prettyPrint()} at {errorIndex and varBinds[int(errorIndex) - 1][0] or "?"}')
-            return False
-        else:
-            print("✅ Basic trap sent successfully!")
-            return True
+    varBinds = list(_burst_template)
+    for index, value in zip(_BURST_FIELDS, (100000 + i * 1000, f'Burst test trap #{i+1}', i + 1)):
+        name, template = _burst_template[index]
+        varBinds[index] = ObjectType(name, template.clone(value))
+    return varBinds
+
+def _send_raw(buf, n, host, port):
+    """Send the first n bytes of buf as one datagram; return an error or None"""
+    try:
+        sock = _raw_sockets.get((host, port))
+        if sock is None:
+            # Connect once so each send() skips sendto()'s address handling
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock.connect((host, port))
+            _raw_sockets[(host, port)] = sock
+        data = memoryview(buf)[:n]
+        try:
+            sock.send(data)
+        except ConnectionRefusedError:
+            # ICMP error for an earlier datagram, which sendto() would have ignored
+            sock.send(data)
+    except OSError as e:
+        return e
+    return None
+
+def _send_fast(name, host, port, community, label):
+    """Send a precomputed trap from fast_traps and report it like the pysnmp path"""
+    data = fast_traps.payload(name, community)
+    errorIndication = _send_raw(data, len(data), host, port)
+    if errorIndication:
+        print(f"Error: {errorIndication}")
+        return False
+    print(f"✅ {label} sent successfully!")
+    return True
 
-def send_server_alert_trap(target_host='127.0.0.1', target_port=162, community='public'):
+def send_basic_trap(target_host='127.0.0.1', target_port=162, community='public', fast=False):
+    """Send a basic SNMP v2c trap"""
+    print(f"Sending basic trap to {target_host}:{target_port}")
+    
+    if fast:
+        return _send_fast('basic', target_host, target_port, community, "Basic trap")
+    
+    errorIndication, errorStatus, errorIndex, varBinds = _send(
+        '1.3.6.1.6.3.1.1.5.1',  # coldStart trap
+        [
+            (SYS_UPTIME, TimeTicks(12345)),
+            (SNMP_TRAP_OID, ObjectIdentifier('1.3.6.1.4.1.20408.4.1.1.2'))
+        ],
+        target_host, target_port, community
+    )
+    if errorIndication:
+        print(f"Error: {errorIndication}")
+        return False
+    elif errorStatus:
+        print(f'Error: {errorStatus.prettyPrint()} at {errorIndex and varBinds[int(errorIndex) - 1][0] or "?"}')
+        return False
+    else:
+        print("✅ Basic trap sent successfully!")
+        return True
+
+def send_server_alert_trap(target_host='127.0.0.1', target_port=162, community='public', fast=False):
     """Send a server alert trap with multiple varbinds"""
     print(f"Sending server alert trap to {target_host}:{target_port}")
     
-    for (errorIndication, errorStatus, errorIndex, varBinds) in sendNotification(
-        SnmpEngine(),
-        CommunityData(community),
-        UdpTransportTarget((target_host, target_port)),
-        ContextData(),
-        'trap',
-        NotificationType(
-            ObjectIdentity('1.3.6.1.4.1.2021')  # Net-SNMP enterprise OID
-        ).addVarBinds(
-            ('1.3.6.1.2.1.1.3.0', TimeTicks(456789)),  # sysUpTime
-            ('1.3.6.1.6.3.1.1.4.1.0', ObjectIdentifier('1.3.6.1.4.1.2021.251.1')),  # trapOID
+    if fast:
+        return _send_fast('server', target_host, target_port, community, "Server alert trap")
+    
+    errorIndication, errorStatus, errorIndex, varBinds = _send(
+        '1.3.6.1.4.1.2021',  # Net-SNMP enterprise OID
+        [
+            (SYS_UPTIME, TimeTicks(456789)),
+            (SNMP_TRAP_OID, ObjectIdentifier('1.3.6.1.4.1.2021.251.1')),
             ('1.3.6.1.2.1.1.5.0', OctetString('server01.company.com')),  # hostname
             ('1.3.6.1.4.1.2021.11.11.0', Integer(95)),  # CPU usage 95%
             ('1.3.6.1.4.1.2021.4.6.0', Integer(1024)),  # Available memory (MB)
             ('1.3.6.1.4.1.2021.251.1.1', OctetString('High CPU usage detected'))  # Alert message
-        )
-    ):
-        if errorIndication:
-            print(f"Error: {errorIndication}")
-            return False
-        elif errorStatus:
-            print(f'Error: {errorStatus.prettyPrint()}')
-            return False
-        else:
-            print("✅ Server alert trap sent successfully!")
-            return True
+        ],
+        target_host, target_port, community
+    )
+    if errorIndication:
+        print(f"Error: {errorIndication}")
+        return False
+    elif errorStatus:
+        print(f'Error: {errorStatus.prettyPrint()}')
+        return False
+    else:
+        print("✅ Server alert trap sent successfully!")
+        return True
 
-def send_interface_down_trap(target_host='127.0.0.1', target_port=162, community='public'):
+def send_interface_down_trap(target_host='127.0.0.1', target_port=162, community='public', fast=False):
     """Send interface down trap (link down)"""
     print(f"Sending interface down trap to {target_host}:{target_port}")
     
-    for (errorIndication, errorStatus, errorIndex, varBinds) in sendNotification(
-        SnmpEngine(),
-        CommunityData(community),
-        UdpTransportTarget((target_host, target_port)),
-        ContextData(),
-        'trap',
-        NotificationType(
-            ObjectIdentity('1.3.6.1.6.3.1.1.5.3')  # linkDown trap
-        ).addVarBinds(
-            ('1.3.6.1.2.1.1.3.0', TimeTicks(789012)),
-            ('1.3.6.1.6.3.1.1.4.1.0', ObjectIdentifier('1.3.6.1.6.3.1.1.5.3')),
+    if fast:
+        return _send_fast('interface', target_host, target_port, community, "Interface down trap")
+    
+    errorIndication, errorStatus, errorIndex, varBinds = _send(
+        '1.3.6.1.6.3.1.1.5.3',  # linkDown trap
+        [
+            (SYS_UPTIME, TimeTicks(789012)),
+            (SNMP_TRAP_OID, ObjectIdentifier('1.3.6.1.6.3.1.1.5.3')),
             ('1.3.6.1.2.1.2.2.1.1.2', Integer(2)),  # ifIndex = 2
             ('1.3.6.1.2.1.2.2.1.2.2', OctetString('GigabitEthernet0/2')),  # ifDescr
             ('1.3.6.1.2.1.2.2.1.7.2', Integer(2)),  # ifAdminStatus = down
             ('1.3.6.1.2.1.2.2.1.8.2', Integer(2))   # ifOperStatus = down
-        )
-    ):
-        if errorIndication:
-            print(f"Error: {errorIndication}")
-            return False
-        elif errorStatus:
-            print(f'Error: {errorStatus.prettyPrint()}')
-            return False
-        else:
-            print("✅ Interface down trap sent successfully!")
-            return True
+        ],
+        target_host, target_port, community
+    )
+    if errorIndication:
+        print(f"Error: {errorIndication}")
+        return False
+    elif errorStatus:
+        print(f'Error: {errorStatus.prettyPrint()}')
+        return False
+    else:
+        print("✅ Interface down trap sent successfully!")
+        return True
 
-def send_custom_enterprise_trap(target_host='127.0.0.1', target_port=162, community='public'):
+def send_custom_enterprise_trap(target_host='127.0.0.1', target_port=162, community='public', fast=False):
     """Send custom enterprise trap"""
     print(f"Sending custom enterprise trap to {target_host}:{target_port}")
     
-    for (errorIndication, errorStatus, errorIndex, varBinds) in sendNotification(
-        SnmpEngine(),
-        CommunityData(community),
-        UdpTransportTarget((target_host, target_port)),
-        ContextData(),
-        'trap',
-        NotificationType(
-            ObjectIdentity('1.3.6.1.4.1.99999.1.1')  # Custom enterprise trap
-        ).addVarBinds(
-            ('1.3.6.1.2.1.1.3.0', TimeTicks(987654)),
-            ('1.3.6.1.6.3.1.1.4.1.0', ObjectIdentifier('1.3.6.1.4.1.99999.1.1.1')),
+    if fast:
+        return _send_fast('custom', target_host, target_port, community, "Custom enterprise trap")
+    
+    errorIndication, errorStatus, errorIndex, varBinds = _send(
+        '1.3.6.1.4.1.99999.1.1',  # Custom enterprise trap
+        [
+            (SYS_UPTIME, TimeTicks(987654)),
+            (SNMP_TRAP_OID, ObjectIdentifier('1.3.6.1.4.1.99999.1.1.1')),
             ('1.3.6.1.4.1.99999.1.1.1', OctetString('OIDyssey Test Application')),
             ('1.3.6.1.4.1.99999.1.1.2', Integer(42)),
             ('1.3.6.1.4.1.99999.1.1.3', OctetString('Test trap from OIDyssey test suite')),
             ('1.3.6.1.4.1.99999.1.1.4', IpAddress('192.168.1.100'))
-        )
-    ):
-        if errorIndication:
-            print(f"Error: {errorIndication}")
-            return False
-        elif errorStatus:
-            print(f'Error: {errorStatus.prettyPrint()}')
-            return False
-        else:
-            print("✅ Custom enterprise trap sent successfully!")
-            return True
+        ],
+        target_host, target_port, community
+    )
+    if errorIndication:
+        print(f"Error: {errorIndication}")
+        return False
+    elif errorStatus:
+        print(f'Error: {errorStatus.prettyPrint()}')
+        return False
+    else:
+        print("✅ Custom enterprise trap sent successfully!")
+        return True
 
-def send_trap_burst(target_host='127.0.0.1', target_port=162, community='public', count=5, interval=1):
-    """Send multiple traps in sequence"""
+def send_trap_burst(target_host='127.0.0.1', target_port=162, community='public', count=5, interval=1, fast=False,
+                    verbose=False):
+    """Send multiple traps in sequence; per-trap progress is only printed when verbose"""
     print(f"Sending {count} traps with {interval}s interval...")
     
+    start = time.perf_counter()
+    nproc = min(os.cpu_count() or 1, _POOL_MAX_PROCS)
+    if count >= _POOL_THRESHOLD and interval <= 0 and nproc > 1:
+        success_count = _send_burst_pool(target_host, target_port, community, count, fast, verbose, nproc)
+    elif fast:
+        success_count = _send_burst_raw(target_host, target_port, community, count, interval, verbose)
+    else:
+        success_count = _send_burst_pysnmp(target_host, target_port, community, count, interval, verbose)
+    elapsed = time.perf_counter() - start
+    
+    lines = [
+        f"Burst complete: {success_count}/{count} traps sent successfully",
+        f"Elapsed: {elapsed:.3f}s ({success_count / elapsed if elapsed > 0 else 0:.0f} traps/s)"
+    ]
+    sys.stdout.write('\n'.join(lines) + '\n')
+    return success_count
+
+def _init_burst_worker():
+    """Give a pool worker its own engine, request IDs and raw socket"""
+    global _ENGINE, _burst_template, _request_ids
+    _ENGINE = SnmpEngine()
+    _target_cache.clear()
+    _raw_sockets.clear()
+    _burst_template = None
+    _request_ids = itertools.count(random.randrange(1 << 30))
+
+def _burst_worker(chunk):
+    """Send one unpaced slice of a burst in a pool worker; return its success count"""
+    target_host, target_port, community, count, fast, verbose, first, stop = chunk
+    send = _send_burst_raw if fast else _send_burst_pysnmp
+    return send(target_host, target_port, community, count, 0, verbose, first, stop)
+
+def _send_burst_pool(target_host, target_port, community, count, fast, verbose, nproc):
+    """Split an unpaced burst into one contiguous slice per worker process"""
+    bounds = [count * k // nproc for k in range(nproc + 1)]
+    chunks = [(target_host, target_port, community, count, fast, verbose, first, stop)
+              for first, stop in zip(bounds, bounds[1:])]
+    with multiprocessing.Pool(nproc, initializer=_init_burst_worker) as pool:
+        return sum(pool.map(_burst_worker, chunks))
+
+def _send_burst_raw(target_host, target_port, community, count, interval, verbose, first=0, stop=None):
+    """Encode and send burst traps first..stop-1 directly into the scratch buffer"""
+    stop = count if stop is None else stop
+    community = community.encode()
     success_count = 0
-    for i in range(count):
-        print(f"Sending trap {i+1}/{count}")
+    next_at = time.perf_counter()
+    for i in range(first, stop):
+        if verbose:
+            print(f"Sending trap {i+1}/{count}")
+        
+        n = encode_trap.build_burst_trap(_SCRATCH, community, next(_request_ids), 100000 + i * 1000, i + 1)
+        errorIndication = _send_raw(_SCRATCH, n, target_host, target_port)
+        if errorIndication:
+            print(f"Error on trap {i+1}: {errorIndication}")
+        else:
+            success_count += 1
+            if verbose:
+                print(f"✅ Trap {i+1} sent successfully!")
         
-        for (errorIndication, errorStatus, errorIndex, varBinds) in sendNotification(
-            SnmpEngine(),
-            CommunityData(community),
-            UdpTransportTarget((target_host, target_port)),
-            ContextData(),
+        if interval > 0 and i < stop - 1:  # Don't sleep after the last trap
+            # Only sleep what is left of this slot once the send is accounted for
+            next_at += interval
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+    
+    return success_count
+
+def _send_burst_pysnmp(target_host, target_port, community, count, interval, verbose, first=0, stop=None):
+    """Queue burst traps first..stop-1 on the shared dispatcher
+
+    Unpaced bursts are flushed in a single dispatcher run. Paced bursts flush
+    each trap as it is queued and sleep only what is left of its slot.
+    """
+    stop = count if stop is None else stop
+    auth, target = _lookup(target_host, target_port, community)
+    state = {'failed': None}
+    success_count = 0
+    
+    # Unconfirmed traps only call back when pysnmp fails to send them
+    def on_error(snmpEngine, sendRequestHandle, errorIndication, errorStatus, errorIndex, varBinds, i):
+        state['failed'] = i
+        if errorIndication:
+            print(f"Error on trap {i+1}: {errorIndication}")
+        else:
+            print(f'Error on trap {i+1}: {errorStatus.prettyPrint()}')
+    
+    next_at = None
+    for i in range(first, stop):
+        if verbose:
+            print(f"Sending trap {i+1}/{count}")
+        async_ntforg.sendNotification(
+            _ENGINE,
+            auth,
+            target,
+            _CTX,
             'trap',
-            NotificationType(
-                ObjectIdentifier('1.3.6.1.4.1.99999.1.2')
-            ).addVarBinds(
-                ('1.3.6.1.2.1.1.3.0', TimeTicks(100000 + i * 1000)),
-                ('1.3.6.1.6.3.1.1.4.1.0', ObjectIdentifier('1.3.6.1.4.1.99999.1.2.1')),
-                ('1.3.6.1.4.1.99999.1.2.1', OctetString(f'Burst test trap #{i+1}')),
-                ('1.3.6.1.4.1.99999.1.2.2', Integer(i+1))
-            )
-        ):
-            if errorIndication:
-                print(f"Error on trap {i+1}: {errorIndication}")
-            elif errorStatus:
-                print(f'Error on trap {i+1}: {errorStatus.prettyPrint()}')
-            else:
-                success_count += 1
+            _burst_varbinds(i),
+            cbFun=on_error,
+            cbCtx=i
+        )
+        if interval > 0:
+            _ENGINE.transportDispatcher.runDispatcher()
+        if state['failed'] != i:
+            success_count += 1
+            if verbose:
                 print(f"✅ Trap {i+1} sent successfully!")
         
-        if i < count - 1:  # Don't sleep after the last trap
-            time.sleep(interval)
+        if interval > 0 and i < stop - 1:  # Don't sleep after the last trap
+            # Slots count from the first trap going out, which also loads the
+            # MIBs and opens the transport
+            if next_at is None:
+                next_at = time.perf_counter()
+            next_at += interval
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+    
+    if interval <= 0 and _ENGINE.transportDispatcher is not None:
+        _ENGINE.transportDispatcher.runDispatcher()
     
-    print(f"Burst complete: {success_count}/{count} traps sent successfully")
     return success_count
 
 def main():
@@ -176,6 +378,10 @@ def main():
                        default='all', help='Test type to run (default: all)')
     parser.add_argument('--count', type=int, default=5, help='Number of traps for burst test (default: 5)')
     parser.add_argument('--interval', type=float, default=1.0, help='Interval between traps in seconds (default: 1.0)')
+    parser.add_argument('--fast', action='store_true',
+                       help='Send precomputed or directly encoded traps instead of going through pysnmp')
+    parser.add_argument('--verbose', '-v', action='store_true',
+                       help='Print progress for every trap in the burst test')
     
     args = parser.parse_args()
     
@@ -191,31 +397,32 @@ def main():
     
     if args.test == 'basic' or args.test == 'all':
         total_tests += 1
-        if send_basic_trap(args.host, args.port, args.community):
+        if send_basic_trap(args.host, args.port, args.community, args.fast):
             success_count += 1
         time.sleep(1)
     
     if args.test == 'server' or args.test == 'all':
         total_tests += 1
-        if send_server_alert_trap(args.host, args.port, args.community):
+        if send_server_alert_trap(args.host, args.port, args.community, args.fast):
             success_count += 1
         time.sleep(1)
     
     if args.test == 'interface' or args.test == 'all':
         total_tests += 1
-        if send_interface_down_trap(args.host, args.port, args.community):
+        if send_interface_down_trap(args.host, args.port, args.community, args.fast):
             success_count += 1
         time.sleep(1)
     
     if args.test == 'custom' or args.test == 'all':
         total_tests += 1
-        if send_custom_enterprise_trap(args.host, args.port, args.community):
+        if send_custom_enterprise_trap(args.host, args.port, args.community, args.fast):
             success_count += 1
         time.sleep(1)
     
     if args.test == 'burst' or args.test == 'all':
         total_tests += 1
-        burst_success = send_trap_burst(args.host, args.port, args.community, args.count, args.interval)
+        burst_success = send_trap_burst(args.host, args.port, args.community, args.count, args.interval, args.fast,
+                                        args.verbose)
         if burst_success > 0:
             success_count += 1
     
@@ -8,189 +8,352 @@ import sys
 import time
 import json
 import argparse
+import functools
+from dataclasses import dataclass, field
 from datetime import datetime
 from pysnmp.hlapi import *
+from pysnmp.hlapi.asyncore import cmdgen as async_cmdgen
+
+try:
+    import orjson
+except ImportError:  # optional; falls back to the stdlib json module
+    orjson = None
+
+@functools.lru_cache(maxsize=256)
+def _oid(oid):
+    """Return a shared ObjectIdentity so each OID is parsed and MIB-resolved once"""
+    return ObjectIdentity(oid)
+
+@dataclass(slots=True)
+class TestResult:
+    """Outcome of a GET or SET"""
+    operation: str
+    oid: str
+    success: bool = False
+    value: str = None
+    error: str = None
+    value_type: str = None  # SET only
+    
+    def to_dict(self):
+        if self.value_type is None:
+            return {'operation': self.operation, 'oid': self.oid, 'success': self.success,
+                    'value': self.value, 'error': self.error}
+        return {'operation': self.operation, 'oid': self.oid, 'value': self.value,
+                'type': self.value_type, 'success': self.success, 'error': self.error}
+
+@dataclass(slots=True)
+class WalkResult:
+    """Outcome of a WALK or BULK, with varbinds kept as parallel lists
+    
+    oids holds OID tuples and vals the raw pyasn1 values; both are only
+    formatted by to_dict(), i.e. when the results are saved.
+    """
+    operation: str
+    oid_prefix: str
+    max_repetitions: int = None  # BULK only
+    success: bool = False
+    error: str = None
+    oids: list = field(default_factory=list)
+    vals: list = field(default_factory=list)
+    
+    @property
+    def count(self):
+        return len(self.oids)
+    
+    def to_dict(self):
+        result = {'operation': self.operation, 'oid_prefix': self.oid_prefix}
+        if self.max_repetitions is not None:
+            result['max_repetitions'] = self.max_repetitions
+        result['success'] = self.success
+        result['count'] = self.count
+        result['values'] = [{'oid': '.'.join(map(str, oid)), 'value': val.prettyPrint()}
+                            for oid, val in zip(self.oids, self.vals)]
+        result['error'] = self.error
+        return result
+
+# SET value types by the name test_snmp_set accepts
+_TYPE_MAP = {
+    'OctetString': OctetString,
+    'Integer': Integer,
+    'IpAddress': IpAddress,
+    'ObjectIdentifier': ObjectIdentifier
+}
+
+def _to_json(obj):
+    """JSON default hook: expand result records into plain dicts"""
+    if isinstance(obj, (TestResult, WalkResult)):
+        return obj.to_dict()
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
 
 class SNMPValidator:
     def __init__(self, host='snmp-emulator', port=161, community='public'):
         self.host = host
         self.port = port
         self.community = community
+        # Whether the agent answers GETBULK; probed by the first walk
+        self._bulk_supported = None
+        # pysnmp objects shared by every request to this target
+        self._engine = SnmpEngine()
+        self._community = CommunityData(community)
+        self._v1_community = CommunityData(community, mpModel=0)
+        self._write_community = CommunityData('private')
+        self._ctx = ContextData()
+        self._transport = None
         self.results = {
             'timestamp': datetime.now().isoformat(),
             'host': host,
             'port': port,
             'tests': []
         }
+        # Whether the agent answered a quick probe; if not, tests fail without sending anything
+        self._reachable = self._probe()
     
-    def test_snmp_get(self, oid):
-        """Test SNMP GET operation"""
-        test_result = {
-            'operation': 'GET',
-            'oid': oid,
-            'success': False,
-            'value': None,
-            'error': None
-        }
+    def _get_transport(self):
+        """Return the transport target, resolving the host on first use"""
+        if self._transport is None:
+            self._transport = UdpTransportTarget((self.host, self.port))
+        return self._transport
+    
+    def _probe(self):
+        """GET sysUpTime.0 once with a short timeout and report whether the agent answered
+        
+        The probe goes out over both SNMPv2c and SNMPv1 so SNMPv1-only agents
+        still count as reachable.
+        """
+        answers = []
+        
+        def cbFun(snmpEngine, sendRequestHandle, errorIndication, errorStatus, errorIndex, varBinds, cbCtx):
+            if not errorIndication:
+                answers.append(cbCtx)
         
         try:
-            errorIndication, errorStatus, errorIndex, varBinds = next(
-                getCmd(SnmpEngine(),
-                       CommunityData(self.community),
-                       UdpTransportTarget((self.host, self.port)),
-                       ContextData(),
-                       ObjectType(ObjectIdentity(oid)))
-            )
-            
+            target = UdpTransportTarget((self.host, self.port), timeout=0.25, retries=0)
+            for authData in (self._community, self._v1_community):
+                async_cmdgen.getCmd(self._engine,
+                                    authData,
+                                    target,
+                                    self._ctx,
+                                    ObjectType(_oid('1.3.6.1.2.1.1.3.0')),
+                                    cbFun=cbFun)
+        except Exception:
+            return False
+        
+        self._run()
+        return bool(answers)
+    
+    def _run(self):
+        """Drive the shared dispatcher until every queued request has completed"""
+        if self._engine.transportDispatcher is not None:
+            self._engine.transportDispatcher.runDispatcher()
+    
+    def _queue_get(self, oids):
+        """Queue a GET for every OID in a single request PDU"""
+        test_results = [TestResult('GET', oid) for oid in oids]
+        self.results['tests'].extend(test_results)
+        
+        if not self._reachable:
+            for test_result in test_results:
+                test_result.error = 'unreachable'
+            return test_results
+        
+        def cbFun(snmpEngine, sendRequestHandle, errorIndication, errorStatus, errorIndex, varBinds, cbCtx):
+            error = None
             if errorIndication:
-                test_result['error'] = str(errorIndication)
+                error = str(errorIndication)
             elif errorStatus:
-                test_result['error'] = f'{errorStatus.prettyPrint()} at {errorIndex}'
+                error = f'{errorStatus.prettyPrint()} at {errorIndex}'
             else:
-                for varBind in varBinds:
-                    test_result['success'] = True
-                    test_result['value'] = str(varBind[1])
+                for test_result, varBind in zip(test_results, varBinds):
+                    test_result.success = True
+                    test_result.value = str(varBind[1])
+            for test_result in test_results:
+                test_result.error = error
+        
+        try:
+            async_cmdgen.getCmd(self._engine,
+                                self._community,
+                                self._get_transport(),
+                                self._ctx,
+                                *[ObjectType(_oid(oid)) for oid in oids],
+                                cbFun=cbFun)
         except Exception as e:
-            test_result['error'] = str(e)
+            for test_result in test_results:
+                test_result.error = str(e)
         
-        self.results['tests'].append(test_result)
-        return test_result['success']
+        return test_results
     
-    def test_snmp_walk(self, oid_prefix):
-        """Test SNMP WALK operation"""
-        test_result = {
-            'operation': 'WALK',
-            'oid_prefix': oid_prefix,
-            'success': False,
-            'count': 0,
-            'values': [],
-            'error': None
-        }
+    def test_snmp_get(self, oids):
+        """Test SNMP GET operation, fetching every OID in a single request PDU
         
-        try:
-            for (errorIndication, errorStatus, errorIndex, varBinds) in nextCmd(
-                SnmpEngine(),
-                CommunityData(self.community),
-                UdpTransportTarget((self.host, self.port)),
-                ContextData(),
-                ObjectType(ObjectIdentity(oid_prefix)),
-                lexicographicMode=False
-            ):
-                if errorIndication:
-                    test_result['error'] = str(errorIndication)
-                    break
-                elif errorStatus:
-                    test_result['error'] = f'{errorStatus.prettyPrint()} at {errorIndex}'
-                    break
-                else:
-                    for varBind in varBinds:
-                        test_result['values'].append({
-                            'oid': str(varBind[0]),
-                            'value': str(varBind[1])
-                        })
-                        test_result['count'] += 1
-            
-            if test_result['count'] > 0:
-                test_result['success'] = True
-        except Exception as e:
-            test_result['error'] = str(e)
+        Takes one OID string and returns its success, or a list of OIDs and
+        returns a list of successes.
+        """
+        if isinstance(oids, str):
+            return self.test_snmp_get([oids])[0]
+        
+        test_results = self._queue_get(oids)
+        self._run()
+        return [test_result.success for test_result in test_results]
+    
+    def _collect(self, test_result, cmd, authData, *args, done=None):
+        """Queue a WALK/BULK against the target, collecting varbinds as responses arrive
+        
+        Each response is followed up from its last varbind until the walk leaves
+        oid_prefix, so several walks can be in flight on the shared dispatcher.
+        done(answered) is called when the walk ends; answered is False if the
+        agent never replied.
+        """
+        prefix = ObjectIdentifier(test_result.oid_prefix)
+        last = None
         
+        def finish(error=None, answered=True):
+            if error is not None:
+                test_result.error = error
+            test_result.success = test_result.count > 0
+            if done is not None:
+                done(answered)
+        
+        def cbFun(snmpEngine, sendRequestHandle, errorIndication, errorStatus, errorIndex, varBindTable, cbCtx):
+            nonlocal last
+            if errorIndication:
+                return finish(str(errorIndication), test_result.count > 0)
+            if errorStatus:
+                # SNMPv1 agents report the end of the MIB as noSuchName
+                if errorStatus == 2:
+                    return finish()
+                return finish(f'{errorStatus.prettyPrint()} at {errorIndex}')
+            if not varBindTable:
+                return finish()
+            for varBinds in varBindTable:
+                name, value = varBinds[0]
+                if isinstance(value, Null) or not prefix.isPrefixOf(name) or (last is not None and name <= last):
+                    return finish()
+                test_result.oids.append(name.asTuple())
+                test_result.vals.append(value)
+                last = name
+            request(last)
+        
+        def request(oid):
+            try:
+                cmd(self._engine,
+                    authData,
+                    self._get_transport(),
+                    self._ctx,
+                    *args,
+                    ObjectType(ObjectIdentity(oid)),
+                    cbFun=cbFun,
+                    lookupMib=False)
+            except Exception as e:
+                finish(str(e), test_result.count > 0)
+        
+        if self._reachable:
+            request(prefix)
+        else:
+            finish('unreachable', False)
+    
+    def _walk_v1(self, test_result, done=None):
+        """GETNEXT walk over SNMPv1, for agents that don't support GETBULK"""
+        self._collect(test_result, async_cmdgen.nextCmd, self._v1_community, done=done)
+    
+    def _queue_walk(self, oid_prefix, max_repetitions=25):
+        """Queue a WALK, using GETBULK unless the agent only speaks SNMPv1"""
+        test_result = WalkResult('WALK', oid_prefix)
         self.results['tests'].append(test_result)
-        return test_result['success']
+        
+        v1_result = WalkResult('WALK', oid_prefix)
+        
+        def bulk_done(answered):
+            if answered:
+                self._bulk_supported = True
+            elif self._bulk_supported is None:
+                # GETBULK went unanswered; check once whether the agent is SNMPv1-only
+                self._walk_v1(v1_result, v1_done)
+        
+        def v1_done(answered):
+            if answered:
+                self._bulk_supported = False
+                test_result.success = v1_result.success
+                test_result.error = v1_result.error
+                test_result.oids = v1_result.oids
+                test_result.vals = v1_result.vals
+        
+        if self._bulk_supported is False:
+            self._walk_v1(test_result)
+        else:
+            self._collect(test_result, async_cmdgen.bulkCmd,
+                          self._community,
+                          0, max_repetitions,
+                          done=bulk_done)
+        
+        return test_result
+    
+    def test_snmp_walk(self, oid_prefix, max_repetitions=25):
+        """Test SNMP WALK operation, using GETBULK unless the agent only speaks SNMPv1"""
+        test_result = self._queue_walk(oid_prefix, max_repetitions)
+        self._run()
+        return test_result.success
     
     def test_snmp_set(self, oid, value, value_type='OctetString'):
         """Test SNMP SET operation"""
-        test_result = {
-            'operation': 'SET',
-            'oid': oid,
-            'value': str(value),
-            'type': value_type,
-            'success': False,
-            'error': None
-        }
-        
-        # Map value types
-        type_map = {
-            'OctetString': OctetString,
-            'Integer': Integer,
-            'IpAddress': IpAddress,
-            'ObjectIdentifier': ObjectIdentifier
-        }
+        return self._set(oid, value, _TYPE_MAP.get(value_type) or OctetString, value_type)
+    
+    def test_snmp_set_typed(self, oid, value, cls):
+        """Test SNMP SET operation with the value's pysnmp class given directly"""
+        return self._set(oid, value, cls, cls.__name__)
+    
+    def _set(self, oid, value, value_class, value_type):
+        """Send a SET of value_class(value) and record it under value_type"""
+        test_result = TestResult('SET', oid, value=str(value), value_type=value_type)
         
-        value_class = type_map.get(value_type, OctetString)
+        if not self._reachable:
+            test_result.error = 'unreachable'
+            self.results['tests'].append(test_result)
+            return False
         
         try:
             errorIndication, errorStatus, errorIndex, varBinds = next(
-                setCmd(SnmpEngine(),
-                       CommunityData('private'),  # Use write community
-                       UdpTransportTarget((self.host, self.port)),
-                       ContextData(),
-                       ObjectType(ObjectIdentity(oid), value_class(value)))
+                setCmd(self._engine,
+                       self._write_community,
+                       self._get_transport(),
+                       self._ctx,
+                       ObjectType(_oid(oid), value_class(value)))
             )
             
             if errorIndication:
-                test_result['error'] = str(errorIndication)
+                test_result.error = str(errorIndication)
             elif errorStatus:
-                test_result['error'] = f'{errorStatus.prettyPrint()} at {errorIndex}'
+                test_result.error = f'{errorStatus.prettyPrint()} at {errorIndex}'
             else:
-                test_result['success'] = True
+                test_result.success = True
         except Exception as e:
-            test_result['error'] = str(e)
+            test_result.error = str(e)
         
         self.results['tests'].append(test_result)
-        return test_result['success']
+        return test_result.success
+    
+    def _queue_bulk(self, oid_prefix, max_repetitions=10):
+        """Queue a BULK"""
+        test_result = WalkResult('BULK', oid_prefix, max_repetitions)
+        self.results['tests'].append(test_result)
+        self._collect(test_result, async_cmdgen.bulkCmd,
+                      self._community,
+                      0, max_repetitions)
+        return test_result
     
     def test_snmp_bulk(self, oid_prefix, max_repetitions=10):
         """Test SNMP BULK operation"""
-        test_result = {
-            'operation': 'BULK',
-            'oid_prefix': oid_prefix,
-            'max_repetitions': max_repetitions,
-            'success': False,
-            'count': 0,
-            'values': [],
-            'error': None
-        }
-        
-        try:
-            for (errorIndication, errorStatus, errorIndex, varBinds) in bulkCmd(
-                SnmpEngine(),
-                CommunityData(self.community),
-                UdpTransportTarget((self.host, self.port)),
-                ContextData(),
-                0, max_repetitions,
-                ObjectType(ObjectIdentity(oid_prefix)),
-                lexicographicMode=False
-            ):
-                if errorIndication:
-                    test_result['error'] = str(errorIndication)
-                    break
-                elif errorStatus:
-                    test_result['error'] = f'{errorStatus.prettyPrint()} at {errorIndex}'
-                    break
-                else:
-                    for varBind in varBinds:
-                        test_result['values'].append({
-                            'oid': str(varBind[0]),
-                            'value': str(varBind[1])
-                        })
-                        test_result['count'] += 1
-            
-            if test_result['count'] > 0:
-                test_result['success'] = True
-        except Exception as e:
-            test_result['error'] = str(e)
-        
-        self.results['tests'].append(test_result)
-        return test_result['success']
+        test_result = self._queue_bulk(oid_prefix, max_repetitions)
+        self._run()
+        return test_result.success
     
     def run_standard_tests(self):
         """Run standard SNMP validation tests"""
         print("🔍 Running SNMP Validation Tests")
         print("="*50)
         
-        # System MIB tests
-        print("\n📊 Testing System MIB OIDs:")
+        if not self._reachable:
+            print(f"⚠️ {self.host}:{self.port} did not answer the probe; skipping SNMP requests")
+        
         system_oids = [
             ('1.3.6.1.2.1.1.1.0', 'sysDescr'),
             ('1.3.6.1.2.1.1.2.0', 'sysObjectID'),
@@ -201,26 +364,31 @@ class SNMPValidator:
             ('1.3.6.1.2.1.1.7.0', 'sysServices')
         ]
         
-        for oid, name in system_oids:
-            success = self.test_snmp_get(oid)
-            status = "✅" if success else "❌"
+        # Queue every test up front so their round trips overlap on one dispatcher
+        get_results = self._queue_get([oid for oid, name in system_oids])
+        if_result = self._queue_walk('1.3.6.1.2.1.2.2.1')
+        bulk_result = self._queue_bulk('1.3.6.1.2.1', 25)
+        self._run()
+        
+        # System MIB tests
+        print("\n📊 Testing System MIB OIDs:")
+        for (oid, name), test_result in zip(system_oids, get_results):
+            status = "✅" if test_result.success else "❌"
             print(f"  {status} {name}: {oid}")
         
         # Interface MIB tests
         print("\n📊 Testing Interface MIB:")
-        if_success = self.test_snmp_walk('1.3.6.1.2.1.2.2.1')
-        status = "✅" if if_success else "❌"
+        status = "✅" if if_result.success else "❌"
         print(f"  {status} Interface table walk")
         
         # Bulk operation test
         print("\n📊 Testing BULK operations:")
-        bulk_success = self.test_snmp_bulk('1.3.6.1.2.1', 25)
-        status = "✅" if bulk_success else "❌"
+        status = "✅" if bulk_result.success else "❌"
         print(f"  {status} Bulk GET (25 repetitions)")
         
         # Calculate success rate
         total_tests = len(self.results['tests'])
-        successful_tests = sum(1 for t in self.results['tests'] if t['success'])
+        successful_tests = sum(1 for t in self.results['tests'] if t.success)
         success_rate = (successful_tests / total_tests * 100) if total_tests > 0 else 0
         
         print("\n" + "="*50)
@@ -231,8 +399,16 @@ class SNMPValidator:
     def save_results(self, filename='test/results/snmp-validation.json'):
         """Save test results to JSON file"""
         try:
-            with open(filename, 'w') as f:
-                json.dump(self.results, f, indent=2)
+            if orjson is not None:
+                with open(filename, 'wb') as f:
+                    f.write(orjson.dumps(
+                        self.results,
+                        default=_to_json,
+                        option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATACLASS
+                    ))
+            else:
+                with open(filename, 'w') as f:
+                    json.dump(self.results, f, indent=2, default=_to_json)
             print(f"\n💾 Results saved to {filename}")
         except Exception as e:
             print(f"\n⚠️ Failed to save results: {e}")
@@ -246,11 +422,11 @@ class SNMPValidator:
         # Group by operation type
         operations = {}
         for test in self.results['tests']:
-            op = test['operation']
+            op = test.operation
             if op not in operations:
                 operations[op] = {'total': 0, 'success': 0}
             operations[op]['total'] += 1
-            if test['success']:
+            if test.success:
                 operations[op]['success'] += 1
         
         for op, stats in operations.items():